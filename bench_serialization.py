@@ -0,0 +1,137 @@
+"""
+Micro-benchmark: JSON encoding cost of one simulation turn.
+
+Replays the encodes one turn performs (one logic cycle, the main loop's frames,
+highlighter and advisor prompts) at 50 and 200 transcript turns, three ways:
+
+- stdlib   : json.dumps per consumer (the code before json_codec)
+- orjson   : json_codec.dumps per consumer, nothing shared
+- shared   : json_codec.cached_dumps / frame, one encode per snapshot
+
+Each state read below is a separate Snapshot when the real loop reads a
+separate version: the logic thread and the advisor see different transcripts
+(tm.log runs in between), update_ranking / update_answer each publish a new
+question version, and set_consolidated_diagnoses a new diagnosis version.
+
+    python bench_serialization.py
+"""
+import json
+import time
+
+import json_codec
+
+N_DIAGNOSES = 8
+N_QUESTIONS = 60
+N_OPEN_QUESTIONS = 45
+REPEATS = 500
+
+# (consumer kind, state read) in turn order
+TURN = [
+    ("prompt", "history_logic"), ("prompt", "hypotheses"),                            # diagnoser
+    ("prompt", "history_logic"), ("prompt", "consolidated_basic"), ("prompt", "candidates"),  # evaluator
+    ("prompt", "history_logic"), ("prompt", "consolidated_full"), ("prompt", "recommend"),    # ranker
+    ("frame", "consolidated_full"), ("frame", "questions_ranked"),                    # logic push
+    ("frame", "questions_ranked"),                                                    # after nurse
+    ("prompt", "consolidated_basic_new"),                                             # highlighter
+    ("frame", "questions_answered"),                                                  # after update_answer
+    ("prompt", "history_advisor"), ("prompt", "recommend_answered"),                  # advisor
+]
+# Raw model output, not a Snapshot: always encoded fresh
+NOT_SNAPSHOTS = {"candidates"}
+
+
+def make_history(turns):
+    history = []
+    for i in range(turns):
+        speaker = "NURSE" if i % 2 == 0 else "PATIENT"
+        entry = {"timestamp": "10:%02d:%02d" % (i // 60 % 60, i % 60), "speaker": speaker,
+                 "text": "I've had a dull pain in my upper right abdomen for about three days, worse after meals. " * 2}
+        if speaker == "PATIENT":
+            entry["highlight"] = [{"level": "warning", "text": "upper right abdomen"}]
+        history.append(entry)
+    return history
+
+
+def make_diagnoses(full):
+    diagnoses = [{"did": f"d{i}", "diagnosis": f"Diagnosis {i}", "indicators_point": ["fever", "RUQ pain", "nausea"]}
+                 for i in range(N_DIAGNOSES)]
+    if full:
+        diagnoses = [{**d, "indicators_count": 3, "probability": "Medium", "rank": i + 1} for i, d in enumerate(diagnoses)]
+    return diagnoses
+
+
+def make_questions(count, answered=False):
+    questions = [{"qid": f"q{i}", "role": "nurse", "content": f"Can you describe symptom number {i} in more detail?",
+                  "score": 0.5, "rank": i + 1, "status": None} for i in range(count)]
+    if answered:
+        questions[0] = {**questions[0], "status": "asked", "answer": "Yes, mostly in the evenings."}
+    return questions
+
+
+def make_state(turns):
+    return {
+        "history_logic": make_history(turns),
+        "history_advisor": make_history(turns + 1),
+        "hypotheses": make_diagnoses(full=False),
+        "consolidated_basic": make_diagnoses(full=False),
+        "candidates": make_diagnoses(full=False),
+        "consolidated_full": make_diagnoses(full=True),
+        "consolidated_basic_new": make_diagnoses(full=False),
+        "recommend": make_questions(N_OPEN_QUESTIONS),
+        "questions_ranked": make_questions(N_QUESTIONS),
+        "questions_answered": make_questions(N_QUESTIONS, answered=True),
+        "recommend_answered": make_questions(N_OPEN_QUESTIONS - 1),
+    }
+
+
+def stdlib_turn(state):
+    for kind, name in TURN:
+        if kind == "prompt":
+            json.dumps(state[name])
+        else:  # starlette's send_json
+            json.dumps({"type": name, "data": state[name]}, ensure_ascii=False, separators=(",", ":"))
+
+
+def orjson_turn(state):
+    for kind, name in TURN:
+        if kind == "prompt":
+            json_codec.dumps(state[name])
+        else:
+            json_codec.dumps({"type": name, "data": state[name]})
+
+
+def shared_turn(state):
+    # The stores build these views once per version; fresh objects every turn
+    views = {name: data if name in NOT_SNAPSHOTS else json_codec.Snapshot(data) for name, data in state.items()}
+    for kind, name in TURN:
+        if kind == "prompt":
+            json_codec.cached_dumps(views[name])
+        else:
+            json_codec.frame(name, views[name])
+
+
+def measure(fn, state):
+    best = float("inf")
+    for _ in range(9):
+        start = time.process_time()
+        for _ in range(REPEATS):
+            fn(state)
+        best = min(best, (time.process_time() - start) / REPEATS)
+    return best
+
+
+if __name__ == "__main__":
+    if json_codec.orjson is None:
+        print("orjson not installed: the 'orjson' columns use json_codec's stdlib fallback")
+    encodes = len(TURN)
+    distinct = len({name for _, name in TURN if name not in NOT_SNAPSHOTS}) + sum(1 for _, name in TURN if name in NOT_SNAPSHOTS)
+    print(f"encodes per turn: {encodes} unshared, {distinct} shared "
+          f"(reused {(encodes - distinct) / encodes:.0%})")
+    print(f"{'turns':>6} {'stdlib':>11} {'orjson':>11} {'shared':>11} {'saved by sharing':>17} {'saved total':>12}")
+    for turns in (50, 200):
+        state = make_state(turns)
+        before = measure(stdlib_turn, state)
+        fast = measure(orjson_turn, state)
+        shared = measure(shared_turn, state)
+        print(f"{turns:>6} {before * 1e6:>8.1f} us {fast * 1e6:>8.1f} us {shared * 1e6:>8.1f} us "
+              f"{(fast - shared) * 1e6:>14.1f} us {(before - shared) * 1e6:>9.1f} us")
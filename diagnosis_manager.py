@@ -0,0 +1,97 @@
+"""
+Diagnosis state shared by SimulationManager (init phase, highlighter context)
+and the ClinicalLogicThread.
+
+Two copy-on-write stores indexed by did:
+- hypotheses   : latest DiagnoseAgent output ("State" in its prompt)
+- consolidated : DiagnoseEvaluatorAgent's merged pool, sent to the frontend
+
+Reads return json_codec.Snapshots whose dicts are shared with other versions;
+never change them. Malformed model output is logged and ignored.
+"""
+import logging
+
+from versioned_state import VersionedStore
+
+logger = logging.getLogger("medforce-backend")
+
+BASIC_FIELDS = ("diagnosis", "did", "indicators_point")
+
+
+def _basic(diagnoses):
+    return [{k: d.get(k) for k in BASIC_FIELDS} for d in diagnoses]
+
+
+def _probability(count):
+    if count >= 4: return "High"
+    if count >= 2: return "Medium"
+    return "Low"
+
+
+def _normalize(diagnoses):
+    merged = {}
+    for pos, d in enumerate(diagnoses):
+        if not isinstance(d, dict):
+            logger.warning(f"Ignoring malformed diagnosis entry: {d!r:.100}")
+            continue
+        did = str(d.get("did") or f"D{pos + 1:03d}")
+        indicators = d.get("indicators_point") or []
+        indicators = [indicators] if isinstance(indicators, str) else list(indicators)
+        if did in merged:
+            # Same did reported twice: keep one entry with the union of indicators
+            indicators = merged[did]["indicators_point"] + [i for i in indicators if i not in merged[did]["indicators_point"]]
+        merged[did] = {"diagnosis": d.get("diagnosis") or "", "did": did, "indicators_point": indicators}
+    return list(merged.values())
+
+
+class _DiagnosisStore(VersionedStore):
+    key = "did"
+
+    def replace(self, diagnoses):
+        if diagnoses is None:
+            diagnoses = []
+        if not isinstance(diagnoses, list):
+            # e.g. the model wrapped the list in an object: keep the current version
+            logger.warning(f"Ignoring malformed diagnosis list: {type(diagnoses).__name__}")
+            return self.version
+        new_items = _normalize(diagnoses)
+
+        def mutate(items, index):
+            if _basic(items) == new_items:
+                return False
+            items[:] = new_items
+        return self._commit(mutate)
+
+
+class DiagnosisManager:
+    def __init__(self):
+        self.hypotheses = _DiagnosisStore()
+        self.consolidated = _DiagnosisStore()
+
+    # --- Hypotheses (DiagnoseAgent) ---
+
+    def update_diagnoses(self, diagnosis_list):
+        return self.hypotheses.replace(diagnosis_list)
+
+    def get_diagnosis_basic(self):
+        return self.hypotheses.view("basic", _basic)
+
+    # --- Consolidated pool (DiagnoseEvaluatorAgent) ---
+
+    def set_consolidated_diagnoses(self, diagnosis_list):
+        return self.consolidated.replace(diagnosis_list)
+
+    def get_consolidated_diagnoses_basic(self):
+        return self.consolidated.view("basic", _basic)
+
+    def get_consolidated_diagnoses(self):
+        """Consolidated pool with count / probability / rank (frontend 'diagnosis' payload)."""
+        return self.consolidated.view("full", self._rank)
+
+    @staticmethod
+    def _rank(diagnoses):
+        ordered = sorted(diagnoses, key=lambda d: -len(d["indicators_point"]))
+        return [
+            {**d, "indicators_count": len(d["indicators_point"]), "probability": _probability(len(d["indicators_point"])), "rank": rank}
+            for rank, d in enumerate(ordered, start=1)
+        ]
@@ -0,0 +1,80 @@
+"""
+Shared JSON serialization layer.
+
+Every logic turn hands the same transcript / diagnosis / question snapshots to
+several agents (prompt building) and to the websocket (frames). Encoding them
+once and sharing the result is cheaper than calling json.dumps per consumer.
+
+- dumps / loads      : fast encoder (orjson when installed, stdlib json otherwise)
+- Snapshot           : read-only list; carries its own encoded form once built
+- cached_dumps       : dumps, memoized on the Snapshot itself
+- frame              : builds a websocket text frame, reusing cached encodings
+
+Output is compact UTF-8 (no spaces after separators, non-ASCII not escaped)
+for both prompts and frames, so a snapshot is encoded once for all consumers.
+"""
+import copy
+import json
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def dumps(obj) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError("Snapshot is read-only; build a new one instead")
+
+
+class Snapshot(list):
+    """
+    A list that cannot be mutated once built.
+
+    Producers (TranscriptManager, the clinical state managers) build a new
+    Snapshot for every version of their state, so one Snapshot maps to exactly
+    one encoded form, stored on the Snapshot and released with it. The items
+    it holds are shared with other versions and must not be changed either.
+    """
+    __slots__ = ("_encoded",)
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __init__(self, items=()):
+        super().__init__(items)
+        self._encoded = None
+
+    def __reduce__(self):
+        return (Snapshot, (list(self),))
+
+
+def snapshot(data) -> Snapshot:
+    """Deep-copies `data` into a Snapshot, for state owned by someone else."""
+    return Snapshot(copy.deepcopy(list(data or [])))
+
+
+def cached_dumps(obj) -> str:
+    # Anything that is not a snapshot may still change; encode it fresh
+    if not isinstance(obj, Snapshot):
+        return dumps(obj)
+    # Two threads may race to fill this; both produce the same string
+    if obj._encoded is None:
+        obj._encoded = dumps(obj)
+    return obj._encoded
+
+
+def frame(type_str, data) -> str:
+    """Websocket frame {"type": ..., "data": ...} with `data` taken from the cache."""
+    return '{"type":' + dumps(type_str) + ',"data":' + cached_dumps(data) + "}"
@@ -0,0 +1,119 @@
+"""
+Question pool shared by the interview loop (status / answers) and the
+ClinicalLogicThread (follow-up questions / ranking).
+
+Questions are looked up by qid through the State index. Every read returns a
+json_codec.Snapshot for the current version, so repeated reads of unchanged
+state also reuse one JSON encoding. The question dicts in a read are shared
+with other versions: never change them, go through the update methods.
+"""
+from versioned_state import VersionedStore
+
+OPEN_STATUS = None
+CLOSED_STATUSES = ("asked", "deleted")
+
+
+def _as_rank(value, fallback):
+    # LLM / questions.json ranks may be null, floats or strings
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):  # OverflowError: inf / 1e400
+        return fallback
+
+
+def _by_rank(questions):
+    return sorted(questions, key=lambda q: q["rank"])
+
+
+class QuestionPoolManager(VersionedStore):
+    key = "qid"
+
+    def __init__(self, question_list=None):
+        questions = []
+        for pos, q in enumerate(question_list or []):
+            questions.append({
+                "qid": str(q.get("qid", f"Q{pos + 1:03d}")),
+                "role": q.get("role", "nurse"),
+                "content": q.get("content") or q.get("question") or "",
+                "score": q.get("score", 0),
+                "rank": _as_rank(q.get("rank"), pos + 1),
+                "status": q.get("status", OPEN_STATUS),
+                **({"answer": q["answer"]} if q.get("answer") else {}),
+            })
+        # Ranks are unique and dense (1..N); a fallback rank may collide with an explicit one
+        ordered = sorted(range(len(questions)), key=lambda pos: (questions[pos]["rank"], pos))
+        for new_rank, pos in enumerate(ordered, start=1):
+            questions[pos]["rank"] = new_rank
+        super().__init__(questions)
+        self._next_id = len(questions) + 1
+
+    # --- Reads (lock-free) ---
+
+    def get_questions(self):
+        """All questions, rank ordered (frontend 'questions' payload)."""
+        return self.view("questions", _by_rank)
+
+    def get_recommend_question(self):
+        """Open questions, rank ordered (input for the ranker and the advisor)."""
+        return self.view("recommend", lambda items: _by_rank(q for q in items if q["status"] not in CLOSED_STATUSES))
+
+    # --- Writes (copy-on-write) ---
+
+    def add_questions_from_text(self, question_texts):
+        def mutate(items, index):
+            known = {q["content"].strip().lower() for q in items}
+            next_rank = max((q["rank"] for q in items), default=0) + 1
+            added = False
+            for text in question_texts or []:
+                text = (text or "").strip()
+                if not text or text.lower() in known:
+                    continue
+                qid = self._new_qid(index)
+                items.append({"qid": qid, "role": "diagnoser", "content": text, "score": 0, "rank": next_rank, "status": OPEN_STATUS})
+                known.add(text.lower())
+                next_rank += 1
+                added = True
+            return added
+        return self._commit(mutate)
+
+    def update_ranking(self, ranked):
+        """
+        Applies ranker output by qid onto the *latest* version. Questions
+        added or closed while the ranker was running are kept; anything the
+        ranker did not rank keeps its relative order after the ranked ones.
+        """
+        ranks = {}
+        for r in ranked or []:
+            qid = r.get("qid") if isinstance(r, dict) else None
+            if qid is not None and qid not in ranks:
+                ranks[qid] = _as_rank(r.get("rank"), len(ranks) + 1)
+
+        def mutate(items, index):
+            if not any(qid in index for qid in ranks):
+                return False
+            ordered = sorted(range(len(items)), key=lambda pos: (items[pos]["qid"] not in ranks, ranks.get(items[pos]["qid"], 0), items[pos]["rank"]))
+            for new_rank, pos in enumerate(ordered, start=1):
+                if items[pos]["rank"] != new_rank:
+                    items[pos] = {**items[pos], "rank": new_rank}
+        return self._commit(mutate)
+
+    def update_status(self, qid, status):
+        return self._update(qid, status=status)
+
+    def update_answer(self, qid, answer):
+        return self._update(qid, answer=answer)
+
+    def _update(self, qid, **fields):
+        def mutate(items, index):
+            pos = index.get(qid)
+            if pos is None or all(items[pos].get(k) == v for k, v in fields.items()):
+                return False
+            items[pos] = {**items[pos], **fields}
+        return self._commit(mutate)
+
+    def _new_qid(self, index):
+        while f"Q{self._next_id:03d}" in index:
+            self._next_id += 1
+        qid = f"Q{self._next_id:03d}"
+        self._next_id += 1
+        return qid
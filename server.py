@@ -17,6 +17,7 @@ import traceback
 # --- Local Modules ---
 import question_manager
 import diagnosis_manager
+import json_codec
 
 import google.auth.transport.requests
 import google.auth.transport.grpc 
@@ -111,13 +112,13 @@ class QuestionRankingAgent(BaseLogicAgent):
         except: self.system_instruction = "Rank by priority."
 
     async def rank_questions(self, conversation_history, current_diagnosis, q_list):
-        prompt = f"Patient Profile:\n{self.patient_info}\n\nHistory:\n{json.dumps(conversation_history)}\n\nDiagnosis:\n{json.dumps(current_diagnosis)}\n\nQuestions:\n{json.dumps(q_list)}"
+        prompt = f"Patient Profile:\n{self.patient_info}\n\nHistory:\n{json_codec.cached_dumps(conversation_history)}\n\nDiagnosis:\n{json_codec.cached_dumps(current_diagnosis)}\n\nQuestions:\n{json_codec.cached_dumps(q_list)}"
         try:
             response = await self.client.aio.models.generate_content(
                 model=RANKER_MODEL, contents=prompt,
                 config=types.GenerateContentConfig(response_mime_type="application/json", response_schema=self.response_schema, system_instruction=self.system_instruction, temperature=0.1)
             )
-            return json.loads(response.text)
+            return json_codec.loads(response.text)
         except Exception as e:
             logger.error(f"Ranker Error: {e}")
             return [{"rank": i+1, "qid": q["qid"]} for i, q in enumerate(q_list)]
@@ -134,10 +135,10 @@ class DiagnosisTriggerAgent(BaseLogicAgent):
         if not conversation_history: return False, "Empty"
         try:
             response = await self.client.aio.models.generate_content(
-                model="gemini-2.5-flash-lite", contents=f"History:\n{json.dumps(conversation_history)}",
+                model="gemini-2.5-flash-lite", contents=f"History:\n{json_codec.cached_dumps(conversation_history)}",
                 config=types.GenerateContentConfig(response_mime_type="application/json", response_schema=self.response_schema, system_instruction=self.system_instruction, temperature=0.0)
             )
-            res = json.loads(response.text)
+            res = json_codec.loads(response.text)
             return res.get("should_run", False), res.get("reason", "")
         except: return True, "Fallback"
 
@@ -150,13 +151,13 @@ class DiagnoseEvaluatorAgent(BaseLogicAgent):
         except: self.system_instruction = "Merge diagnoses."
 
     async def evaluate_diagnoses(self, diagnosis_pool, new_diagnosis_list, interview_data):
-        prompt = f"Context:\n{json.dumps(interview_data)}\n\nMaster Pool:\n{json.dumps(diagnosis_pool)}\n\nNew Candidates:\n{json.dumps(new_diagnosis_list)}"
+        prompt = f"Context:\n{json_codec.cached_dumps(interview_data)}\n\nMaster Pool:\n{json_codec.cached_dumps(diagnosis_pool)}\n\nNew Candidates:\n{json_codec.cached_dumps(new_diagnosis_list)}"
         try:
             response = await self.client.aio.models.generate_content(
                 model="gemini-2.5-flash-lite", contents=prompt,
                 config=types.GenerateContentConfig(response_mime_type="application/json", response_schema=self.response_schema, system_instruction=self.system_instruction, temperature=0.1)
             )
-            return json.loads(response.text)
+            return json_codec.loads(response.text)
         except: return diagnosis_pool + new_diagnosis_list
 
 class DiagnoseAgent(BaseLogicAgent):
@@ -169,13 +170,13 @@ class DiagnoseAgent(BaseLogicAgent):
         except: self.system_instruction = "Diagnose patient."
 
     async def get_diagnosis_update(self, interview_data, current_diagnosis_hypothesis):
-        prompt = f"Patient:\n{self.patient_info}\n\nTranscript:\n{json.dumps(interview_data)}\n\nState:\n{json.dumps(current_diagnosis_hypothesis)}"
+        prompt = f"Patient:\n{self.patient_info}\n\nTranscript:\n{json_codec.cached_dumps(interview_data)}\n\nState:\n{json_codec.cached_dumps(current_diagnosis_hypothesis)}"
         try:
             response = await self.client.aio.models.generate_content(
                 model=DIAGNOSER_MODEL, contents=prompt,
                 config=types.GenerateContentConfig(response_mime_type="application/json", response_schema=self.response_schema, system_instruction=self.system_instruction, temperature=0.2)
             )
-            res = json.loads(response.text)
+            res = json_codec.loads(response.text)
             return {"diagnosis_list": res.get("diagnosis_list", []), "follow_up_questions": res.get("follow_up_questions", [])}
         except: return {"diagnosis_list": current_diagnosis_hypothesis, "follow_up_questions": []}
 
@@ -189,13 +190,13 @@ class AdvisorAgent(BaseLogicAgent):
         except: self.system_instruction = "Advise nurse."
 
     async def get_advise(self, conversation_history, q_list):
-        prompt = f"Context:\n{self.patient_info}\n\nHistory:\n{json.dumps(conversation_history)}\n\nQuestions:\n{json.dumps(q_list)}"
+        prompt = f"Context:\n{self.patient_info}\n\nHistory:\n{json_codec.cached_dumps(conversation_history)}\n\nQuestions:\n{json_codec.cached_dumps(q_list)}"
         try:
             response = await self.client.aio.models.generate_content(
                 model=ADVISOR_MODEL, contents=prompt,
                 config=types.GenerateContentConfig(response_mime_type="application/json", response_schema=self.response_schema, system_instruction=self.system_instruction, temperature=0.2)
             )
-            res = json.loads(response.text)
+            res = json_codec.loads(response.text)
             return res.get("question"), res.get("reasoning"), res.get("end_conversation"), res.get("qid")
         except: return "Continue.", "Error", False, None
 
@@ -209,13 +210,13 @@ class AnswerHighlighterAgent(BaseLogicAgent):
 
     async def highlight_text(self, patient_answer: str, diagnosis_list: list):
         if not patient_answer or len(patient_answer) < 3: return []
-        prompt = f"Context:\n{json.dumps(diagnosis_list)}\n\nAnswer:\n\"{patient_answer}\""
+        prompt = f"Context:\n{json_codec.cached_dumps(diagnosis_list)}\n\nAnswer:\n\"{patient_answer}\""
         try:
             response = await self.client.aio.models.generate_content(
                 model="gemini-2.5-flash-lite", contents=prompt,
                 config=types.GenerateContentConfig(response_mime_type="application/json", response_schema=self.response_schema, system_instruction=self.system_instruction, temperature=0.0)
             )
-            return json.loads(response.text)
+            return json_codec.loads(response.text)
         except: return []
 
 # ==========================================
@@ -225,6 +226,7 @@ class AnswerHighlighterAgent(BaseLogicAgent):
 class TranscriptManager:
     def __init__(self):
         self.history = []
+        self._snapshot = json_codec.Snapshot()
         self._lock = threading.Lock()
     
     def log(self, speaker, text, highlight_data=None):
@@ -232,11 +234,15 @@ class TranscriptManager:
             entry = {"timestamp": datetime.datetime.now().strftime("%H:%M:%S"), "speaker": speaker, "text": text.strip()}
             if speaker == "PATIENT": entry["highlight"] = highlight_data or []
             self.history.append(entry)
+            self._snapshot = None
             logger.info(f"📝 {speaker}: {text[:50]}...")
     
     def get_history(self):
+        # One read-only snapshot per transcript change, shared by every consumer (and its JSON encoding)
         with self._lock:
-            return copy.deepcopy(self.history)
+            if self._snapshot is None:
+                self._snapshot = json_codec.snapshot(self.history)
+            return self._snapshot
 
 class ClinicalLogicThread(threading.Thread):
     def __init__(self, transcript_manager, qm, dm, shared_state, main_loop, websocket):
@@ -268,7 +274,7 @@ class ClinicalLogicThread(threading.Thread):
         if self.websocket and self.main_loop and not self.websocket.client_state.name == "DISCONNECTED":
             try:
                 future = asyncio.run_coroutine_threadsafe(
-                    self.websocket.send_json({"type": type_str, "data": data}),
+                    self.websocket.send_text(json_codec.frame(type_str, data)),
                     self.main_loop
                 )
                 future.result(timeout=1)
@@ -312,8 +318,6 @@ class ClinicalLogicThread(threading.Thread):
                     await self._push_update("diagnosis", diag_stream)
                     await self._push_update("questions", self.qm.get_questions())
                     
-                    self.shared_state["ranked_questions"] = self.qm.get_recommend_question()
-                    
                     # Update checkpoint
                     self.last_processed_count = current_len
                     logger.info("✅ Logic Cycle Complete")
@@ -375,12 +379,12 @@ class TextBridgeAgent:
                 # 1. AUDIO STREAMING
                 if data := response.data:
                     b64_audio = base64.b64encode(data).decode('utf-8')
-                    await websocket.send_json({
+                    await websocket.send_text(json_codec.dumps({
                         "type": "audio",
                         "id": turn_id,
                         "speaker": self.name,
                         "data": b64_audio
-                    })
+                    }))
                     # Tiny yield to allow event loop to handle other websocket traffic
                     await asyncio.sleep(0.005) 
 
@@ -391,21 +395,21 @@ class TextBridgeAgent:
                         text_accumulator.append(text_chunk)
                         
                         # Send DELTA immediately to frontend
-                        await websocket.send_json({
+                        await websocket.send_text(json_codec.dumps({
                             "type": "text_delta",
                             "id": turn_id,
                             "speaker": self.name,
                             "text": text_chunk,
-                        })
+                        }))
 
                 # 3. TURN COMPLETE
                 if response.server_content and response.server_content.turn_complete:
                     # Notify frontend audio is done streaming for this turn
-                    await websocket.send_json({
+                    await websocket.send_text(json_codec.dumps({
                         "type": "turn_complete",
                         "id": turn_id,
                         "speaker": self.name
-                    })
+                    }))
                     
                     # Process full text for Logic Agents (Highlights, Diagnosis, etc.)
                     full_text = "".join(text_accumulator).strip()
@@ -418,13 +422,13 @@ class TextBridgeAgent:
 
                         # Send the "Finalized" transcript with highlights
                         # The frontend can replace the streamed text with this rich version
-                        await websocket.send_json({
+                        await websocket.send_text(json_codec.dumps({
                             "type": "transcript_final",
                             "id": turn_id,
                             "speaker": self.name,
                             "text": full_text,
                             "highlights": highlights
-                        })
+                        }))
                         return full_text, highlights
                     return "[...]", []
                     
@@ -456,7 +460,6 @@ class SimulationManager:
         
         self.cycle = 0
         self.shared_state = {
-            "ranked_questions": self.qm.get_recommend_question(),
             "cycle": 0,
             "patient_info" : self.PATIENT_INFO
         }
@@ -464,7 +467,7 @@ class SimulationManager:
 
     async def run(self):
         self.running = True
-        await self.websocket.send_json({"type": "system", "message": "Initializing Agents..."})
+        await self.websocket.send_text(json_codec.dumps({"type": "system", "message": "Initializing Agents..."}))
 
         # --- INITIALIZATION PHASE (Running on Main Thread BEFORE loop) ---
         try:
@@ -493,15 +496,14 @@ class SimulationManager:
             self.qm.update_ranking(ranked_q)
 
             # 5. Push Updates
-            self.shared_state["ranked_questions"] = self.qm.get_recommend_question()
-            await self.websocket.send_json({"type": "diagnosis", "data": diag_stream})
-            await self.websocket.send_json({"type": "questions", "data": self.qm.get_questions()})
+            await self.websocket.send_text(json_codec.frame("diagnosis", diag_stream))
+            await self.websocket.send_text(json_codec.frame("questions", self.qm.get_questions()))
             
             logger.info("✅ Init Logic Complete")
 
         except Exception as e:
             logger.error(f"Init Error: {e}")
-            await self.websocket.send_json({"type": "system", "message": "Init Error, proceeding..."})
+            await self.websocket.send_text(json_codec.dumps({"type": "system", "message": "Init Error, proceeding..."}))
 
         # --- START BACKGROUND MONITORING ---
         logic_thread = ClinicalLogicThread(
@@ -514,7 +516,7 @@ class SimulationManager:
         async with contextlib.AsyncExitStack() as stack:
             self.nurse.set_session(await stack.enter_async_context(self.nurse.get_connection_context()))
             self.patient.set_session(await stack.enter_async_context(self.patient.get_connection_context()))
-            await self.websocket.send_json({"type": "system", "message": "Starting Assessment."})
+            await self.websocket.send_text(json_codec.dumps({"type": "system", "message": "Starting Assessment."}))
 
 
 
@@ -535,7 +537,7 @@ class SimulationManager:
                 self.tm.log("NURSE", nurse_text)
 
                 await asyncio.sleep(0.5)
-                await self.websocket.send_json({"type": "questions", "data": self.qm.get_questions()})
+                await self.websocket.send_text(json_codec.frame("questions", self.qm.get_questions()))
 
                 # --- 2. PATIENT ---
                 current_diagnosis_context = self.dm.get_consolidated_diagnoses_basic()
@@ -554,23 +556,23 @@ class SimulationManager:
 
                 if last_qid:
                     self.qm.update_answer(last_qid, patient_text)
-                    await self.websocket.send_json({"type": "questions", "data": self.qm.get_questions()})
+                    await self.websocket.send_text(json_codec.frame("questions", self.qm.get_questions()))
 
                 self.tm.log("PATIENT", patient_text, highlight_data=highlight_result)
                 await asyncio.sleep(0.5)
-                await self.websocket.send_json({"type": "turn", "data": "finish cycle"})
+                await self.websocket.send_text(json_codec.dumps({"type": "turn", "data": "finish cycle"}))
                 if interview_end: break
 
                 # --- 3. ADVISOR ---
                 try:
-                    current_ranked = self.shared_state["ranked_questions"]
+                    current_ranked = self.qm.get_recommend_question()
                     question, reasoning, status, qid = await self.advisor.get_advise(self.tm.get_history(), current_ranked)
                     
                     if qid: 
                         self.qm.update_status(qid, "asked")
                         last_qid = qid
                     
-                    await self.websocket.send_json({"type": "system", "message": f"Logic: {reasoning}"})
+                    await self.websocket.send_text(json_codec.dumps({"type": "system", "message": f"Logic: {reasoning}"}))
                     
                     next_instruction = question
                     interview_end = status
@@ -582,7 +584,7 @@ class SimulationManager:
 
                 if self.websocket.client_state.name == "DISCONNECTED": break
 
-            await self.websocket.send_json({"type": "turn", "data": "end"})
+            await self.websocket.send_text(json_codec.dumps({"type": "turn", "data": "end"}))
 
         logic_thread.stop()
 
@@ -0,0 +1,32 @@
+from diagnosis_manager import DiagnosisManager
+
+
+def test_consolidated_pool_is_ranked_by_indicators():
+    dm = DiagnosisManager()
+    dm.set_consolidated_diagnoses([
+        {"diagnosis": "Gastritis", "did": "d1", "indicators_point": ["nausea"]},
+        {"diagnosis": "Cholecystitis", "did": "d2", "indicators_point": ["RUQ pain", "fever", "nausea", "meals"]},
+    ])
+    full = dm.get_consolidated_diagnoses()
+    assert [(d["did"], d["rank"], d["probability"]) for d in full] == [("d2", 1, "High"), ("d1", 2, "Low")]
+    assert dm.get_consolidated_diagnoses_basic()[0] == {"diagnosis": "Gastritis", "did": "d1", "indicators_point": ["nausea"]}
+
+
+def test_unchanged_update_keeps_version():
+    dm = DiagnosisManager()
+    dm.update_diagnoses([{"diagnosis": "A", "did": "d1", "indicators_point": ["x"]}])
+    basic = dm.get_diagnosis_basic()
+    dm.update_diagnoses([{"diagnosis": "A", "did": "d1", "indicators_point": ["x"]}])
+    assert dm.get_diagnosis_basic() is basic
+
+
+def test_malformed_output_is_ignored():
+    dm = DiagnosisManager()
+    dm.set_consolidated_diagnoses([{"diagnosis": "A", "did": "d1", "indicators_point": ["x"]}])
+    before = dm.get_consolidated_diagnoses()
+
+    dm.set_consolidated_diagnoses({"diagnosis_list": []})
+    assert dm.get_consolidated_diagnoses() is before
+
+    dm.set_consolidated_diagnoses(["junk", {"diagnosis": "B", "did": "d2", "indicators_point": "y"}])
+    assert [(d["did"], d["indicators_point"]) for d in dm.get_consolidated_diagnoses()] == [("d2", ["y"])]
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+import json_codec
+
+
+DATA = [{"qid": "Q001", "content": "Douleur à l'abdomen?", "rank": 1, "status": None}]
+
+
+def test_frame_round_trips():
+    for data in (json_codec.Snapshot(DATA), list(DATA)):
+        assert json_codec.loads(json_codec.frame("questions", data)) == {"type": "questions", "data": DATA}
+
+
+def test_snapshot_encoding_is_memoized():
+    snap = json_codec.Snapshot(DATA)
+    assert json_codec.cached_dumps(snap) is json_codec.cached_dumps(snap)
+
+    plain = [{"a": 1}]
+    first = json_codec.cached_dumps(plain)
+    plain.append({"b": 2})
+    assert json_codec.cached_dumps(plain) != first
+    assert json_codec.loads(json_codec.cached_dumps(plain)) == [{"a": 1}, {"b": 2}]
+
+
+def test_snapshot_is_read_only():
+    snap = json_codec.Snapshot([3, 1, 2])
+    with pytest.raises(TypeError): snap.append(4)
+    with pytest.raises(TypeError): snap += [4]
+    with pytest.raises(TypeError): snap[0] = 0
+    with pytest.raises(TypeError): snap.sort()
+    assert snap == [3, 1, 2]
+
+    combined = snap + [4]
+    assert type(combined) is list and combined == [3, 1, 2, 4]
+
+
+def test_stdlib_fallback_matches_orjson(monkeypatch):
+    if json_codec.orjson is None:
+        pytest.skip("orjson not installed")
+    fast = json_codec.dumps(DATA)
+
+    monkeypatch.setattr(json_codec, "orjson", None)
+    fallback = json_codec.dumps(DATA)
+    assert fallback == fast
+    # What starlette's send_json used to put on the wire: compact, non-ASCII kept
+    assert fallback == json.dumps(DATA, ensure_ascii=False, separators=(",", ":"))
+    assert "à" in fallback
+    assert json_codec.loads(fallback) == DATA
@@ -0,0 +1,92 @@
+import json
+import threading
+
+from question_manager import QuestionPoolManager
+
+
+def make_pool():
+    return QuestionPoolManager([
+        {"qid": "Q001", "content": "Where is the pain?"},
+        {"qid": "Q002", "content": "Any fever?"},
+        {"qid": "Q003", "content": "Any nausea?"},
+    ])
+
+
+def ranks(qm):
+    return [(q["qid"], q["rank"]) for q in qm.get_questions()]
+
+
+def test_reads_are_shared_per_version():
+    qm = make_pool()
+    assert qm.get_questions() is qm.get_questions()
+    before = qm.get_recommend_question()
+    qm.update_status("Q001", "asked")
+    assert [q["qid"] for q in before] == ["Q001", "Q002", "Q003"]
+    assert [q["qid"] for q in qm.get_recommend_question()] == ["Q002", "Q003"]
+
+
+def test_ranking_keeps_changes_made_while_ranker_ran():
+    qm = make_pool()
+    q_list = qm.get_recommend_question()
+
+    # Meanwhile: a follow-up is added and a question gets asked and answered
+    qm.add_questions_from_text(["Does it hurt after meals?"])
+    qm.update_status("Q002", "asked")
+    qm.update_answer("Q002", "No fever.")
+
+    qm.update_ranking([{"rank": i + 1, "qid": q["qid"]} for i, q in enumerate(reversed(q_list))])
+
+    questions = {q["qid"]: q for q in qm.get_questions()}
+    assert set(questions) == {"Q001", "Q002", "Q003", "Q004"}
+    assert questions["Q002"]["status"] == "asked"
+    assert questions["Q002"]["answer"] == "No fever."
+    assert ranks(qm) == [("Q003", 1), ("Q002", 2), ("Q001", 3), ("Q004", 4)]
+
+
+def test_ranking_tolerates_bad_ranker_output():
+    qm = make_pool()
+    qm.update_ranking([{"qid": "Q002", "rank": None}, {"qid": "Q003", "rank": "2"}, "junk", {"rank": 1}])
+    assert sorted(r for _, r in ranks(qm)) == [1, 2, 3]
+    assert ranks(qm)[0] == ("Q002", 1)
+
+    # Stdlib json.loads (no orjson) accepts Infinity / 1e400
+    qm.update_ranking(json.loads('[{"qid": "Q003", "rank": 1e400}, {"qid": "Q001", "rank": Infinity}]'))
+    assert sorted(r for _, r in ranks(qm)) == [1, 2, 3]
+
+    version = qm.version
+    qm.update_ranking([{"qid": "unknown", "rank": 1}])
+    assert qm.version == version
+
+
+def test_null_initial_rank():
+    qm = QuestionPoolManager([{"qid": "A", "content": "x", "rank": None}, {"qid": "B", "content": "y", "rank": 1}])
+    # A null rank falls back to the question's position, then ranks are renumbered 1..N
+    assert ranks(qm) == [("A", 1), ("B", 2)]
+
+
+def test_concurrent_updates_keep_unique_qids_and_dense_ranks():
+    qm = make_pool()
+
+    def adder():
+        for i in range(300):
+            qm.add_questions_from_text([f"Follow-up {i}?"])
+
+    def ranker():
+        for _ in range(300):
+            q_list = qm.get_recommend_question()
+            qm.update_ranking([{"rank": i + 1, "qid": q["qid"]} for i, q in enumerate(reversed(q_list))])
+
+    def asker():
+        for _ in range(300):
+            q_list = qm.get_recommend_question()
+            if q_list:
+                qm.update_status(q_list[-1]["qid"], "asked")
+
+    threads = [threading.Thread(target=fn) for fn in (adder, ranker, asker)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    questions = qm.get_questions()
+    assert len(questions) == 303
+    assert len({q["qid"] for q in questions}) == 303
+    assert sorted(q["rank"] for q in questions) == list(range(1, 304))
@@ -0,0 +1,65 @@
+"""
+Copy-on-write state shared by the main loop and the ClinicalLogicThread.
+
+A store holds one immutable State (version, items, index). Readers grab the
+current State reference without locking; writers build a new State under a
+short lock and swap it in. Items inside a State are never mutated: a writer
+copies the dict it changes and reuses the rest, so an older snapshot that is
+still in use (e.g. by an LLM call in flight) stays consistent.
+
+No I/O or awaits happen under the lock, so every method is safe to call from
+a coroutine on either event loop.
+"""
+import threading
+from typing import NamedTuple
+
+import json_codec
+
+
+class State(NamedTuple):
+    version: int
+    items: json_codec.Snapshot  # never mutated once published
+    index: dict                 # key -> position in items
+
+
+class VersionedStore:
+    key = "id"
+
+    def __init__(self, items=None):
+        self._lock = threading.Lock()
+        self._views = {}
+        self._state = self._build(0, [dict(i) for i in items or []])
+
+    def _build(self, version, items):
+        return State(version, json_codec.Snapshot(items), {item[self.key]: pos for pos, item in enumerate(items)})
+
+    @property
+    def version(self) -> int:
+        return self._state.version
+
+    def view(self, name, build):
+        """
+        Derived Snapshot of the current State, built once per version. Its
+        item dicts may be shared with other versions and must not be changed.
+        """
+        state = self._state
+        cached = self._views.get(name)
+        if cached is not None and cached[0] == state.version:
+            return cached[1]
+        view = json_codec.Snapshot(build(state.items))
+        self._views[name] = (state.version, view)
+        return view
+
+    def _commit(self, mutate):
+        """
+        Runs `mutate(items, index)` on a shallow copy of the current items and
+        publishes the result as the next version. `mutate` must replace, not
+        edit, any item dict it changes. Returning False skips the commit.
+        """
+        with self._lock:
+            current = self._state
+            items = list(current.items)
+            if mutate(items, current.index) is False:
+                return current.version
+            self._state = self._build(current.version + 1, items)
+            return self._state.version